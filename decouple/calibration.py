@@ -1,13 +1,25 @@
+import json
 import os
 import sys
 from datetime import datetime
 
-from .raw_convert import IMAGE_EXTENSIONS, RAW_EXTENSIONS, TIFF_EXTENSIONS
+from .raw_convert import (
+    IMAGE_EXTENSIONS,
+    RAW_EXTENSIONS,
+    RAW_MODE_AUTO,
+    RAW_MODE_DNG,
+    RAW_MODE_LIBRAW,
+    TIFF_EXTENSIONS,
+    adobe_dng_converter_available,
+    is_raw_path,
+)
 
 
 APP_NAME = "DecoupleTool"
 CONFIG_FILENAME = "config.json"
 CALIBRATION_MATRIX_FILENAME = "calibration_matrix.npy"
+ROI_CACHE_FILENAME = "roi_cache.json"
+ROI_CACHE_MAX_ENTRIES = 64
 
 
 def get_app_config_dir():
@@ -39,6 +51,74 @@ def get_calibration_matrix_path():
     return os.path.join(get_app_config_dir(), CALIBRATION_MATRIX_FILENAME)
 
 
+def get_roi_cache_path():
+    return os.path.join(get_app_config_dir(), ROI_CACHE_FILENAME)
+
+
+def load_roi_cache(path=None):
+    try:
+        with open(path or get_roi_cache_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_roi_cache(cache, path=None):
+    # 按最近使用顺序只保留最后 ROI_CACHE_MAX_ENTRIES 条
+    entries = list(cache.items())[-ROI_CACHE_MAX_ENTRIES:]
+    try:
+        with open(path or get_roi_cache_path(), "w", encoding="utf-8") as f:
+            json.dump(dict(entries), f, indent=4, ensure_ascii=False)
+    except OSError as e:
+        print(f"保存 ROI 缓存失败: {e}")
+
+
+def _roi_cache_entry(path, raw_mode, black_level):
+    stat_result = os.stat(path)
+    if not is_raw_path(path):
+        raw_mode = None
+    elif raw_mode == RAW_MODE_AUTO:
+        # 与 convert_raws_to_tiffs 一致地解析自动模式，安装 Adobe DNG Converter 后缓存随之失效
+        raw_mode = RAW_MODE_DNG if adobe_dng_converter_available() else RAW_MODE_LIBRAW
+    return {
+        "size": stat_result.st_size,
+        "mtime_ns": stat_result.st_mtime_ns,
+        "raw_mode": raw_mode,
+        "black_level": black_level,
+    }
+
+
+def _is_roi_vector(roi):
+    return (
+        isinstance(roi, list)
+        and len(roi) == 3
+        and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in roi)
+    )
+
+
+def lookup_cached_roi(cache, path, raw_mode, black_level):
+    """文件大小、修改时间及 RAW 转换模式均未变化时返回缓存的 ROI 均值，否则返回 None"""
+    key = os.path.abspath(path)
+    entry = cache.get(key)
+    # 手动修改或损坏的条目按未命中处理，重新计算后会被覆盖
+    if not isinstance(entry, dict) or not _is_roi_vector(entry.get("roi")):
+        return None
+    expected = _roi_cache_entry(path, raw_mode, black_level)
+    if any(entry.get(name) != value for name, value in expected.items()):
+        return None
+    cache[key] = cache.pop(key)  # 标记为最近使用
+    return entry["roi"]
+
+
+def store_cached_roi(cache, path, raw_mode, black_level, roi):
+    key = os.path.abspath(path)
+    entry = _roi_cache_entry(path, raw_mode, black_level)
+    entry["roi"] = [float(value) for value in roi]
+    cache.pop(key, None)
+    cache[key] = entry
+
+
 def format_cache_timestamp(path=None):
     cache_path = path or get_calibration_matrix_path()
     if not os.path.exists(cache_path):
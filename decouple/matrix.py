@@ -0,0 +1,73 @@
+import numpy as np
+
+
+UINT16_MAX = 65535
+# 每个行带约含的像素数：float32 中间结果约 768 KB，连同 uint16 输入输出可留在 L2/L3 缓存内，
+# 各步骤在同一块数据上连续完成，避免整图多次往返内存
+TILE_PIXELS = 1 << 16
+
+
+def black_level_bias(M, black_lvl):
+    """M @ (x - b) = M @ x - M @ b：把黑电平折算成输出端的逐通道偏置，黑电平为 0 时返回 None。"""
+    if not black_lvl:
+        return None
+    return (-M @ np.full(3, black_lvl, dtype=M.dtype)).astype(np.float32)
+
+
+def decouple_matrix_operand(M):
+    """批处理前算一次：pixels @ M.T 所需的 float32 连续矩阵。"""
+    return np.ascontiguousarray(M.T, dtype=np.float32)
+
+
+def apply_decouple_matrix(pixels, MT, bias, out, work=None):
+    """将 (N, 3) uint16 像素右乘 MT 并加上 bias，结果写入 out (N, 3) uint16。
+
+    work 为可选的 (N, 3) float32 中间缓冲区，传入则不再分配。
+
+    只调用 NumPy 的 ufunc / matmul / copyto，这些调用的内层循环都会释放 GIL，
+    可以被多个线程同时调用。计算使用 float32：uint16 输入乘 3x3 矩阵，
+    float32 的 24 位尾数足够，内存带宽和 BLAS 开销都只有 float64 的一半。
+    """
+    if work is None:
+        work = np.empty(pixels.shape, dtype=np.float32)
+    np.matmul(pixels, MT, out=work, dtype=np.float32)
+    if bias is not None:
+        work += bias
+    np.clip(work, 0, UINT16_MAX, out=work)
+    np.copyto(out, work, casting="unsafe")
+    return out
+
+
+def solve_decouple_matrix(M_obs):
+    """由观测矩阵（列为 R/G/B 光源下的三通道均值）求行归一化的解耦矩阵。"""
+    # 3x3 用伴随矩阵闭式求逆：伴随矩阵的三列是行向量两两叉乘，det 是第一行与其点积，
+    # 不需要 LAPACK 的 det / inv / cond（SVD）调用
+    a0, a1, a2 = M_obs
+    adjugate = np.column_stack((np.cross(a1, a2), np.cross(a2, a0), np.cross(a0, a1)))
+    det = a0 @ adjugate[:, 0]
+    # |det| 不超过各列范数之积 (Hadamard 不等式)，用它归一化后再判断奇异，与曝光亮度的量级无关
+    scale = np.prod(np.linalg.norm(M_obs, axis=0))
+    if scale == 0 or abs(det) < 1e-15 * scale:
+        raise ValueError("观测矩阵奇异，无法计算")
+    M_inv = adjugate / det
+    row_sums = M_inv.sum(axis=1, keepdims=True)
+    return M_inv / row_sums
+
+
+def decouple_tile_rows(h, w):
+    return max(1, min(h, TILE_PIXELS // max(w, 1)))
+
+
+def decouple_bands(arr, MT, bias, out, work):
+    """按行带处理 (H, W, 3) 图像，逐个行带产出 (rows, W, 3) uint16 结果。
+
+    out / work 为 (rows * W, 3) 的 uint16 / float32 缓冲区，各行带复用：
+    产出的行带是 out 的视图，取下一个行带前必须用完。
+    """
+    h, w = arr.shape[:2]
+    rows = work.shape[0] // w
+    for y0 in range(0, h, rows):
+        y1 = min(y0 + rows, h)
+        n = (y1 - y0) * w
+        apply_decouple_matrix(arr[y0:y1].reshape(-1, 3), MT, bias, out[:n], work[:n])
+        yield out[:n].reshape(y1 - y0, w, 3)
@@ -20,7 +20,13 @@ from .calibration import (
 from .icc import CUSTOM_ICC_OPTION, ICC_PROFILE_FILES
 from .paths import get_app_base_path
 from .raw_convert import RAW_MODE_AUTO, RAW_MODE_DNG, RAW_MODE_LIBRAW, image_file_filter
-from .worker import ProcessingWorker
+from .worker import (
+    DEFAULT_TIFF_COMPRESSION,
+    TIFF_COMPRESSION_NONE,
+    TIFF_COMPRESSION_ZLIB,
+    TIFF_COMPRESSION_ZSTD,
+    ProcessingWorker,
+)
 
 RAW_MODE_LABELS = {
     RAW_MODE_AUTO:   "自动",
@@ -35,6 +41,17 @@ def raw_mode_from_label(label):
     return next((k for k, v in RAW_MODE_LABELS.items() if v == label), DEFAULT_RAW_MODE)
 
 
+TIFF_COMPRESSION_LABELS = {
+    TIFF_COMPRESSION_ZLIB: "Deflate（推荐，兼容 Adobe 软件）",
+    TIFF_COMPRESSION_ZSTD: "Zstd（更快，Adobe 软件无法打开）",
+    TIFF_COMPRESSION_NONE: "不压缩（最快，文件最大）",
+}
+
+
+def compression_from_label(label):
+    return next((k for k, v in TIFF_COMPRESSION_LABELS.items() if v == label), DEFAULT_TIFF_COMPRESSION)
+
+
 class FileCard(QFrame):
     remove_requested = Signal(str)
 
@@ -368,6 +385,12 @@ class MainWindow(QMainWindow):
             self.combo_raw_mode.addItem(label)
         grid_layout.addWidget(self.combo_raw_mode, 5, 1, 1, 2)
 
+        grid_layout.addWidget(QLabel("TIFF 压缩:"), 6, 0)
+        self.combo_compression = QComboBox()
+        for label in TIFF_COMPRESSION_LABELS.values():
+            self.combo_compression.addItem(label)
+        grid_layout.addWidget(self.combo_compression, 6, 1, 1, 2)
+
         main_layout.addWidget(group_box)
 
         self.progress_bar = QProgressBar()
@@ -812,6 +835,7 @@ class MainWindow(QMainWindow):
             "icc_profile_mode": "none",
             "custom_icc_path": "",
             "raw_mode": DEFAULT_RAW_MODE,
+            "tiff_compression": DEFAULT_TIFF_COMPRESSION,
         }
         cfg_path = self.get_standard_config_path()
         if os.path.exists(cfg_path):
@@ -839,6 +863,11 @@ class MainWindow(QMainWindow):
         idx = self.combo_raw_mode.findText(raw_label)
         self.combo_raw_mode.setCurrentIndex(idx if idx >= 0 else 0)
 
+        compression = defaults.get("tiff_compression", DEFAULT_TIFF_COMPRESSION)
+        compression_label = TIFF_COMPRESSION_LABELS.get(compression, TIFF_COMPRESSION_LABELS[DEFAULT_TIFF_COMPRESSION])
+        idx = self.combo_compression.findText(compression_label)
+        self.combo_compression.setCurrentIndex(idx if idx >= 0 else 0)
+
     def save_settings(self):
         input_files = self.input_drop.files()
         input_dir_to_save = self.last_input_dir
@@ -858,6 +887,7 @@ class MainWindow(QMainWindow):
             "icc_profile_mode": self.combo_icc.currentText(),
             "custom_icc_path": self.custom_icc_path,
             "raw_mode": raw_mode,
+            "tiff_compression": compression_from_label(self.combo_compression.currentText()),
         }
         try:
             with open(self.get_standard_config_path(), 'w', encoding='utf-8') as f:
@@ -877,6 +907,7 @@ class MainWindow(QMainWindow):
         custom_icc_path = self.custom_icc_path.strip()
         raw_label = self.combo_raw_mode.currentText()
         raw_mode = raw_mode_from_label(raw_label)
+        compression = compression_from_label(self.combo_compression.currentText())
         self.save_settings()
 
         if not all([self.dir_output, self.dir_contactsheet]):
@@ -921,6 +952,7 @@ class MainWindow(QMainWindow):
             use_cache_override=True,
             matrix_path=matrix_path,
             raw_mode=raw_mode,
+            compression=compression,
         )
         self.worker.progress_updated.connect(self.on_worker_progress)
         self.worker.finished_success.connect(self.on_worker_success)
@@ -951,6 +983,7 @@ class MainWindow(QMainWindow):
         self.btn_contactsheet.setEnabled(not running)
         self.combo_icc.setEnabled(not running)
         self.combo_raw_mode.setEnabled(not running)
+        self.combo_compression.setEnabled(not running)
         if running: self.progress_bar.setValue(0)
         else:
             self.btn_action.setEnabled(True)
@@ -1,12 +1,33 @@
+import mmap
 import os
 import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
 import tifffile
 
 from PySide6.QtCore import QThread, Signal
 
-from .calibration import get_calibration_matrix_path, validate_rgb_calibration_files
+from .calibration import (
+    get_calibration_matrix_path,
+    load_roi_cache,
+    lookup_cached_roi,
+    save_roi_cache,
+    store_cached_roi,
+    validate_rgb_calibration_files,
+)
 from .icc import CUSTOM_ICC_OPTION, ICC_PROFILE_FILES
+from .matrix import (
+    black_level_bias,
+    decouple_bands,
+    decouple_matrix_operand,
+    decouple_tile_rows,
+    solve_decouple_matrix,
+)
 from .paths import get_app_base_path
 from .raw_convert import (
     IMAGE_EXTENSIONS,
@@ -19,6 +40,191 @@ from .raw_convert import (
 )
 
 
+# 同时处理的图片数。解码/编码与 NumPy 计算都会释放 GIL，线程即可并行；
+# 至少 2 个，单核机器上也能让一张图的磁盘读写与另一张图的计算重叠；
+# 每个线程各持有整图大小的读写缓冲区，因此不宜开太多
+IMAGE_WORKERS = max(2, min(4, os.cpu_count() or 1))
+PROGRESS_EMIT_INTERVAL = 0.1  # 秒；逐图进度最多按此频率发给 UI
+CONTACT_SHEET_STEP = 5  # 缩略图总览的抽样间隔
+
+TIFF_COMPRESSION_ZLIB = "zlib"
+TIFF_COMPRESSION_ZSTD = "zstd"
+TIFF_COMPRESSION_NONE = "none"
+DEFAULT_TIFF_COMPRESSION = TIFF_COMPRESSION_ZLIB
+# Adobe Deflate 兼容 Lightroom/Photoshop 等软件；低压缩级别配合水平差分预测，比默认级别更快且文件更小。
+# zstd 编码快数倍、体积相近，但 Adobe 系软件读不了；不压缩最快，体积最大
+TIFF_COMPRESSION_KWARGS = {
+    TIFF_COMPRESSION_ZLIB: {
+        "compression": tifffile.COMPRESSION.ADOBE_DEFLATE,
+        "compressionargs": {"level": 1},
+        "predictor": tifffile.PREDICTOR.HORIZONTAL,
+    },
+    TIFF_COMPRESSION_ZSTD: {
+        "compression": tifffile.COMPRESSION.ZSTD,
+        "compressionargs": {"level": 1},
+        "predictor": tifffile.PREDICTOR.HORIZONTAL,
+    },
+    TIFF_COMPRESSION_NONE: {},
+}
+
+# 每个线程各自持有一组可复用的读写缓冲区，同尺寸的批量图片不必反复分配内存
+_thread_buffers = threading.local()
+
+
+def _reusable_buffer(name, shape, dtype):
+    buf = getattr(_thread_buffers, name, None)
+    if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+        buf = np.empty(shape, dtype=dtype)
+        setattr(_thread_buffers, name, buf)
+    return buf
+
+
+def _downsample_area(img, step):
+    """按 step x step 块取均值缩小 (H, W, 3) uint16 图像（与 INTER_AREA 等价，避免隔点抽样的混叠）。"""
+    h, w = img.shape[0] // step * step, img.shape[1] // step * step
+    if h == 0 or w == 0:
+        return img[::step, ::step].copy()
+    # 按行、再按列做步长累加，每次只是一遍连续的整数加法
+    rows = np.zeros((h // step, w, img.shape[2]), dtype=np.uint32)
+    for k in range(step):
+        rows += img[k:h:step, :w]
+    blocks = np.zeros((h // step, w // step, img.shape[2]), dtype=np.uint32)
+    for k in range(step):
+        blocks += rows[:, k::step]
+    blocks += step * step // 2
+    blocks //= step * step
+    return blocks.astype(np.uint16)
+
+
+def _strip_encoder(save_kwargs):
+    """按 get_tiff_save_kwargs 的压缩参数，返回把 (rows, W, 3) 行带编码为 TIFF strip 字节的函数。
+
+    编码器表取自 tifffile 的内部注册表 TIFF.COMPRESSORS / TIFF.PREDICTORS；
+    当前 tifffile 版本没有对应条目时返回 None，由调用方改为整图写出。
+    """
+    compression = save_kwargs.get("compression")
+    if not compression:
+        return lambda strip: strip.tobytes()
+    registry = getattr(tifffile, "TIFF", None)
+    try:
+        compressor = registry.COMPRESSORS[compression]
+        predictor = save_kwargs.get("predictor")
+        predictorfunc = registry.PREDICTORS[predictor] if predictor else None
+    except (AttributeError, KeyError, TypeError):
+        return None
+    compressionargs = save_kwargs.get("compressionargs", {})
+    if predictorfunc is None:
+        return lambda strip: compressor(strip, **compressionargs)
+    # 与 tifffile 相同：水平差分沿宽度方向 (axis=-2) 进行，各通道分别差分
+    return lambda strip: compressor(predictorfunc(strip, axis=-2), **compressionargs)
+
+
+# Windows / macOS 的默认文件系统不区分大小写，IMG1.tif 与 img1.TIF 会写到同一个文件
+_CASE_INSENSITIVE_FS = sys.platform in ("win32", "darwin")
+
+
+def _output_path_key(path):
+    """用于判断两个输出路径是否指向同一文件的比较键"""
+    key = os.path.normcase(os.path.abspath(path))
+    return key.casefold() if _CASE_INSENSITIVE_FS else key
+
+
+def _require_rgb_shape(shape, path):
+    if len(shape) != 3 or shape[2] != 3:
+        raise ValueError(f"需要 RGB 三通道图片，当前形状为 {tuple(shape)}: {path}")
+
+
+def _advise_sequential(fd):
+    """提示内核该文件描述符将被顺序读取，加大预读（仅支持 posix_fadvise 的平台）"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    except OSError:
+        pass
+
+
+@contextmanager
+def _drop_page_cache_after(path):
+    """读完后提示内核释放该文件的页缓存（仅支持 posix_fadvise 的平台）"""
+    yield
+    if not hasattr(os, "posix_fadvise"):
+        return
+    # DONTNEED 作用于整个文件的页缓存，与用哪个文件描述符发出无关
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _memmap_series(tif, path, sequential=False):
+    """未压缩且连续存储的图像直接内存映射（按文件字节序），否则返回 None
+
+    sequential 为 True 时对映射区发出 madvise(MADV_SEQUENTIAL)：fadvise 只影响 read() 的预读，
+    缺页读入映射区的预读需要单独提示。
+    """
+    series = tif.series[0]
+    if series.dataoffset is None:
+        return None
+    dtype = series.dtype.newbyteorder(tif.byteorder)
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if sequential and hasattr(mapping, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        try:
+            mapping.madvise(mmap.MADV_SEQUENTIAL)
+        except OSError:
+            pass
+    # 数组持有映射的引用，数组释放后映射随之解除
+    count = int(np.prod(series.shape))
+    return np.frombuffer(mapping, dtype=dtype, count=count, offset=series.dataoffset).reshape(series.shape)
+
+
+def _decode_region(tif, y0, y1, x0, x1):
+    """只解码与 [y0:y1, x0:x1] 相交的 strip / tile，返回该区域的 (rows, cols, 3) 数组"""
+    page = tif.pages[0]
+    if page.shape != tif.series[0].shape or page.imagedepth != 1 or page.planarconfig != 1:
+        return tif.asarray()[y0:y1, x0:x1]
+    seg_h, seg_w = page.chunks[-3], page.chunks[-2]
+    seg_cols = page.chunked[-2]
+    indices = [
+        r * seg_cols + c
+        for r in range(y0 // seg_h, (y1 - 1) // seg_h + 1)
+        for c in range(x0 // seg_w, (x1 - 1) // seg_w + 1)
+    ]
+    region = np.zeros((y1 - y0, x1 - x0, page.shape[-1]), dtype=page.dtype)
+    segments = tif.filehandle.read_segments(
+        [page.dataoffsets[i] for i in indices], [page.databytecounts[i] for i in indices], indices
+    )
+    for data, index in segments:
+        segment, (_, _, sy, sx, _), _ = page.decode(data, index)
+        if segment is None:  # 缺失的段按 0 填充
+            continue
+        segment = segment[0]
+        # 边缘的 tile 带有填充，按图像内的实际范围求交集
+        top, bottom = max(sy, y0), min(sy + segment.shape[0], y1)
+        left, right = max(sx, x0), min(sx + segment.shape[1], x1)
+        region[top - y0:bottom - y0, left - x0:right - x0] = segment[top - sy:bottom - sy, left - sx:right - sx]
+    return region
+
+
+def _open_rgb_tiff(path, name, allow_mmap=True):
+    """能内存映射则映射，像素在按行带处理时才逐块读入；否则解码到可复用缓冲区"""
+    # 先用文件头里的形状做校验，不合格的文件不必完整解码
+    with tifffile.TiffFile(path) as tif:
+        series = tif.series[0]
+        _require_rgb_shape(series.shape, path)
+        mapped = _memmap_series(tif, path, sequential=True) if allow_mmap else None
+        if mapped is not None:
+            return mapped
+        # 预读提示需发给真正读取文件的描述符
+        _advise_sequential(tif.filehandle.fileno())
+        out = _reusable_buffer(name, series.shape, series.dtype)
+        return tif.asarray(out=out)
+
+
 # =========================================================================
 # 后台工作线程 (Worker)
 # =========================================================================
@@ -28,7 +234,7 @@ class ProcessingWorker(QThread):
     finished_error = Signal(str)         # 失败信号 (错误信息)
     request_confirmation = Signal(str, str) # 请求确认信号 (标题, 内容)
     
-    def __init__(self, rgb_files, input_files, dir_output, dir_contactsheet, icc_mode="none", custom_icc_path="", use_cache_override=None, matrix_path=None, calibration_only=False, confirm_calibration=True, raw_mode=RAW_MODE_AUTO):
+    def __init__(self, rgb_files, input_files, dir_output, dir_contactsheet, icc_mode="none", custom_icc_path="", use_cache_override=None, matrix_path=None, calibration_only=False, confirm_calibration=True, raw_mode=RAW_MODE_AUTO, compression=DEFAULT_TIFF_COMPRESSION):
         super().__init__()
         if isinstance(rgb_files, (str, bytes, os.PathLike)):
             self.rgb_files = [os.fspath(rgb_files)]
@@ -41,15 +247,19 @@ class ProcessingWorker(QThread):
         self.custom_icc_path = custom_icc_path
         self.use_cache_override = use_cache_override
         self.raw_mode = raw_mode
+        self.compression = compression
         self.matrix_path = matrix_path or get_calibration_matrix_path()
         self.calibration_only = calibration_only
         self.confirm_calibration = confirm_calibration
         self._is_cancelled = False
         self._selected_icc_bytes = None
         self._temp_dirs = []
+        self._M_T_f32 = None
+        self._bias = None
+        self._last_progress = None
+        self._last_progress_time = 0.0
         
         # 线程同步工具
-        import threading
         self._confirm_event = threading.Event()
         self._confirm_result = False
 
@@ -70,6 +280,15 @@ class ProcessingWorker(QThread):
         self._confirm_event.wait()
         return self._confirm_result
 
+    def _emit_progress_throttled(self, value, message, force=False):
+        """百分比变化或距上次发送超过 PROGRESS_EMIT_INTERVAL 才发信号，避免每张图都触发一次 UI 重绘"""
+        now = time.monotonic()
+        if not force and value == self._last_progress and now - self._last_progress_time < PROGRESS_EMIT_INTERVAL:
+            return
+        self._last_progress = value
+        self._last_progress_time = now
+        self.progress_updated.emit(value, message)
+
     def run(self):
         try:
             black_level = 0
@@ -91,23 +310,44 @@ class ProcessingWorker(QThread):
                     if self._is_cancelled: return
 
                     calibration_source_paths = self.get_calibration_paths()
-                    calibration_paths = self.prepare_readable_images(
-                        calibration_source_paths,
+                    # 文件未变化时直接沿用上次的 ROI 均值，RAW 也不必重新转换
+                    roi_cache = load_roi_cache()
+                    cached_vecs = [
+                        lookup_cached_roi(roi_cache, path, self.raw_mode, black_level)
+                        for path in calibration_source_paths
+                    ]
+                    uncached_paths = [
+                        path for path, vec in zip(calibration_source_paths, cached_vecs) if vec is None
+                    ]
+                    readable_paths = dict(zip(uncached_paths, self.prepare_readable_images(
+                        uncached_paths,
                         "正在转换校正图片",
                         progress_value=0,
-                    )
-                    vecs = []
-                    file_names = []
-                    
-                    for idx, (source_path, read_path) in enumerate(zip(calibration_source_paths, calibration_paths)):
+                    )))
+                    computed_vecs = {}
+                    if uncached_paths:
                         if self._is_cancelled: return
-                        display_name = os.path.basename(source_path)
-                        self.progress_updated.emit(0, f"正在读取校正图片: {display_name} ...")
-                        vec = self.get_roi_average(read_path, black_level)
-                        vecs.append(vec)
-                        file_names.append(display_name)
-                    
-                    vecs = np.array(vecs).T 
+                        names = "、".join(os.path.basename(path) for path in uncached_paths)
+                        self.progress_updated.emit(0, f"正在读取校正图片: {names} ...")
+                        # 几张校正图同时读取，解码期间会释放 GIL
+                        with ThreadPoolExecutor(max_workers=len(uncached_paths)) as executor:
+                            roi_vecs = executor.map(
+                                lambda path: self.get_roi_average(readable_paths[path], black_level),
+                                uncached_paths,
+                            )
+                            for path, vec in zip(uncached_paths, roi_vecs):
+                                computed_vecs[path] = vec
+                                store_cached_roi(roi_cache, path, self.raw_mode, black_level, vec)
+                        save_roi_cache(roi_cache)
+                    if self._is_cancelled: return
+
+                    # 每列为一张校正图的三通道均值，直接按列填入
+                    vecs = np.empty((3, len(calibration_source_paths)), dtype=np.float64)
+                    file_names = [os.path.basename(path) for path in calibration_source_paths]
+
+                    for idx, (source_path, cached_vec) in enumerate(zip(calibration_source_paths, cached_vecs)):
+                        vecs[:, idx] = computed_vecs[source_path] if cached_vec is None else cached_vec
+
                     idx_r = np.argmax(vecs[0, :])
                     idx_g = np.argmax(vecs[1, :])
                     idx_b = np.argmax(vecs[2, :])
@@ -123,13 +363,8 @@ class ProcessingWorker(QThread):
                             self.finished_error.emit("用户取消处理")
                         return
 
-                    M_obs = np.column_stack((vecs[:, idx_r], vecs[:, idx_g], vecs[:, idx_b]))
-                    if np.linalg.cond(M_obs) > 1e15:
-                        raise ValueError("观测矩阵奇异，无法计算")
-                    
-                    M_inv = np.linalg.inv(M_obs)
-                    row_sums = M_inv.sum(axis=1, keepdims=True)
-                    M_Final = M_inv / row_sums
+                    M_obs = vecs[:, [idx_r, idx_g, idx_b]]
+                    M_Final = solve_decouple_matrix(M_obs)
                     
                     matrix_dir = os.path.dirname(self.matrix_path)
                     if matrix_dir:
@@ -146,32 +381,50 @@ class ProcessingWorker(QThread):
                 
                 total = len(self.input_files)
                 if total == 0: raise ValueError("未选择输入文件")
+                out_paths = [os.path.join(self.dir_output, output_tiff_name(path)) for path in self.input_files]
+                path_counts = Counter(_output_path_key(path) for path in out_paths)
+                duplicated = sorted({
+                    os.path.basename(path) for path in out_paths if path_counts[_output_path_key(path)] > 1
+                })
+                if duplicated:
+                    raise ValueError(f"多个输入文件会输出为同名文件，无法同时处理: {'、'.join(duplicated)}")
                 readable_inputs = self.prepare_readable_images(
                     self.input_files,
                     "正在转换输入图片",
                     progress_value=10,
                 )
 
-                generated_files = [] 
+                generated_files = [None] * total
+                thumbnails = [None] * total
+                self._M_T_f32 = decouple_matrix_operand(M_Final)
+                self._bias = black_level_bias(M_Final, black_level)
 
-                for i, (in_path, read_path) in enumerate(zip(self.input_files, readable_inputs)):
-                    if self._is_cancelled: return
-                    
-                    fname = os.path.basename(in_path)
-                    out_path = os.path.join(self.dir_output, output_tiff_name(in_path))
-                    
-                    self.process_image(read_path, out_path, M_Final, black_level)
-                    generated_files.append(out_path)
-                    
-                    prog = int(10 + (i + 1) / total * 80)
-                    self.progress_updated.emit(prog, f"正在处理: {fname}")
+                with ThreadPoolExecutor(max_workers=min(IMAGE_WORKERS, total)) as executor:
+                    futures = {
+                        executor.submit(self._process_image_job, read_path, out_path): i
+                        for i, (read_path, out_path) in enumerate(zip(readable_inputs, out_paths))
+                    }
+                    try:
+                        for done, future in enumerate(as_completed(futures), 1):
+                            thumbnail = future.result()
+                            if self._is_cancelled: return
+                            i = futures[future]
+                            generated_files[i] = out_paths[i]
+                            thumbnails[i] = thumbnail
+
+                            fname = os.path.basename(self.input_files[i])
+                            prog = int(10 + done / total * 80)
+                            self._emit_progress_throttled(prog, f"正在处理: {fname}", force=(done == total))
+                    finally:
+                        # 出错或取消时丢弃尚未开始的任务，只等待正在处理的图片结束
+                        executor.shutdown(cancel_futures=True)
 
                 # --- Step 3: Contact Sheet ---
                 if self._is_cancelled: return
                 
                 if len(generated_files) > 1:
                     self.progress_updated.emit(90, "步骤 3/4: 生成缩略图总览...")
-                    self.create_contact_sheet(generated_files, self.dir_contactsheet)
+                    self.create_contact_sheet(generated_files, self.dir_contactsheet, thumbnails)
                 else:
                     self.progress_updated.emit(90, "步骤 3/4: 单张图片，跳过缩略图...")
 
@@ -202,32 +455,80 @@ class ProcessingWorker(QThread):
         return [converted_map.get(path, path) for path in paths]
 
     def get_roi_average(self, path, black_lvl):
-        img = tifffile.imread(path)
-        arr = img.astype(np.float64)
-        arr = arr - black_lvl
-        if arr.ndim != 3 or arr.shape[2] != 3:
-            raise ValueError(f"需要 RGB 三通道图片，当前形状为 {arr.shape}: {path}")
-        h, w = arr.shape[:2]
-        if h > 10 and w > 10:
-            roi = arr[int(h*0.4):int(h*0.6), int(w*0.4):int(w*0.6)]
-        else:
-            roi = arr
-        return np.mean(roi, axis=(0, 1))
-
-    def process_image(self, in_path, out_path, M, black_lvl):
-        arr = tifffile.imread(in_path).astype(np.float64)
-        arr = arr - black_lvl
-        if arr.ndim != 3 or arr.shape[2] != 3:
-            raise ValueError(f"需要 RGB 三通道图片，当前形状为 {arr.shape}: {in_path}")
-        h, w, c = arr.shape
-        pixels = arr.reshape(-1, 3)
-        pixels_corr = pixels @ M.T
-        pixels_corr = np.clip(pixels_corr, 0, 65535)
-        img_out_arr = pixels_corr.reshape(h, w, c).astype(np.uint16)
-        tifffile.imwrite(out_path, img_out_arr, **self.get_tiff_save_kwargs(in_path))
+        with tifffile.TiffFile(path) as tif:
+            shape = tif.series[0].shape
+            _require_rgb_shape(shape, path)
+            h, w = shape[:2]
+            if h > 10 and w > 10:
+                y0, y1, x0, x1 = int(h*0.4), int(h*0.6), int(w*0.4), int(w*0.6)
+            else:
+                y0, y1, x0, x1 = 0, h, 0, w
+            # 能内存映射时只有中心 ROI 会被实际读入；压缩文件只解码与 ROI 相交的 strip / tile
+            img = _memmap_series(tif, path)
+            if img is not None:
+                roi = img[y0:y1, x0:x1]
+            else:
+                roi = _decode_region(tif, y0, y1, x0, x1)
+        # 直接用 float64 累加 uint16 的 ROI，不生成 float64 副本；黑电平在均值上扣除即可
+        mean = np.mean(roi, axis=(0, 1), dtype=np.float64)
+        del img, roi  # 尽快释放映射，临时目录中的文件随后会被删除
+        if black_lvl:
+            mean = mean - black_lvl
+        return mean
+
+    def _process_image_job(self, in_path, out_path):
+        if self._is_cancelled: return None
+        return self.process_image(in_path, out_path)
+
+    def process_image(self, in_path, out_path):
+        """用 run() 中算好的 self._M_T_f32 / self._bias 处理单张图片，返回缩略图"""
+        save_kwargs = self.get_tiff_save_kwargs(in_path)
+        encode_strip = _strip_encoder(save_kwargs)
+        thumbnail_parts = []
+        # 输出就是输入本身时（输出目录与输入目录相同）不能内存映射：
+        # 写出会截断仍被映射的文件（Windows 上则无法打开），只能先完整解码
+        overwrite_input = os.path.exists(out_path) and os.path.samefile(in_path, out_path)
+        # 内存映射的输入在写出过程中才真正被读取，读完整个处理过程后再释放页缓存
+        with _drop_page_cache_after(in_path):
+            arr = _open_rgb_tiff(in_path, "input", allow_mmap=not overwrite_input)
+            h, w = arr.shape[:2]
+            # 每个行带即输出文件的一个 strip；行数取缩略图步长的整数倍，缩略图可逐带拼接
+            rows = max(decouple_tile_rows(h, w), min(h, CONTACT_SHEET_STEP))
+            if rows >= CONTACT_SHEET_STEP:
+                rows -= rows % CONTACT_SHEET_STEP
+            band_out = _reusable_buffer("output", (rows * w, 3), np.uint16)
+            work = _reusable_buffer("work", (rows * w, 3), np.float32)
+
+            def decoupled_bands():
+                for band in decouple_bands(arr, self._M_T_f32, self._bias, band_out, work):
+                    # 顺便生成缩略图给总览使用，省去之后重新解码输出文件
+                    # 末尾不足一个步长的行带不参与整块均值（宽度不足一个步长时为隔点抽样，仍需保留）
+                    tail = len(band) < CONTACT_SHEET_STEP and len(band) < h
+                    if not tail or w < CONTACT_SHEET_STEP:
+                        thumbnail_parts.append(_downsample_area(band, CONTACT_SHEET_STEP))
+                    yield band
+
+            if encode_strip is not None:
+                # 逐个 strip 编码写出，不再持有整图大小的输出数组
+                tifffile.imwrite(
+                    out_path, (encode_strip(band) for band in decoupled_bands()), shape=arr.shape,
+                    dtype=np.uint16, rowsperstrip=rows, photometric="rgb", **save_kwargs
+                )
+            else:
+                img_out_arr = _reusable_buffer("output_image", arr.shape, np.uint16)
+                y = 0
+                for band in decoupled_bands():
+                    img_out_arr[y:y + len(band)] = band
+                    y += len(band)
+                tifffile.imwrite(out_path, img_out_arr, photometric="rgb", **save_kwargs)
+            del arr  # 及时解除映射
+        return np.concatenate(thumbnail_parts)
 
     def get_tiff_save_kwargs(self, in_path):
-        save_kwargs = {"compression": "zlib"}
+        compression_kwargs = TIFF_COMPRESSION_KWARGS.get(self.compression)
+        if compression_kwargs is None:
+            raise ValueError(f"未知压缩选项: {self.compression}")
+        save_kwargs = dict(compression_kwargs)
         icc_bytes = self.get_icc_profile_bytes(in_path)
         if icc_bytes:
             save_kwargs["extratags"] = [(34675, "B", len(icc_bytes), icc_bytes, False)]
@@ -263,15 +564,25 @@ class ProcessingWorker(QThread):
         left = (w - target_w) // 2
         return img[top:top + target_h, left:left + target_w, :]
 
-    def create_contact_sheet(self, image_paths, output_dir):
+    def create_contact_sheet(self, image_paths, output_dir, thumbnails=None):
+        """thumbnails 为 process_image 返回的缩略图；未提供时从输出文件重新读取。
+
+        缩略图贴入画布后即释放（thumbnails 中对应项会被置为 None）。
+        """
         if not image_paths: return
         imgs = []
         min_w, min_h = None, None
 
-        for path in image_paths:
-            if not os.path.exists(path): continue
-            img = tifffile.imread(path)
-            img_small = img[::5, ::5, :]
+        for idx, path in enumerate(image_paths):
+            img_small = thumbnails[idx] if thumbnails else None
+            if img_small is None:
+                if not os.path.exists(path): continue
+                img = tifffile.imread(path)
+                img_small = _downsample_area(img, CONTACT_SHEET_STEP)
+                del img
+            else:
+                # 所有权转交给 imgs，贴图后便可立即回收
+                thumbnails[idx] = None
             imgs.append(img_small)
             h, w = img_small.shape[:2]
             min_w = w if min_w is None else min(min_w, w)
@@ -280,19 +591,29 @@ class ProcessingWorker(QThread):
         if not imgs: return
         if min_w is None or min_h is None: return
 
-        cropped_imgs = [self._center_crop_image(img, min_h, min_w) for img in imgs]
         cols = 6
-        rows = int(np.ceil(len(cropped_imgs) / cols))
+        rows = int(np.ceil(len(imgs) / cols))
         canvas_w = cols * min_w
         canvas_h = rows * min_h
+        # np.zeros 的页面在首次写入时才真正占用内存；边贴边释放缩略图，
+        # 峰值内存约为一份缩略图总量，而不是缩略图加整张画布
         contact_sheet = np.zeros((canvas_h, canvas_w, 3), dtype=np.uint16)
 
-        for idx, img in enumerate(cropped_imgs):
+        # 完整的行通过 (行, 高, 列, 宽, 3) 视图直接写入画布，不需要整张网格的 np.stack 副本；
+        # 只有最后不满的一行按坐标粘贴
+        full_rows = len(imgs) // cols
+        grid = contact_sheet[:full_rows * min_h].reshape(full_rows, min_h, cols, min_w, 3)
+        for idx in range(len(imgs)):
             row = idx // cols
             col = idx % cols
-            x = col * min_w
-            y = row * min_h
-            contact_sheet[y:y + min_h, x:x + min_w, :] = img
+            crop = self._center_crop_image(imgs[idx], min_h, min_w)
+            if row < full_rows:
+                grid[row, :, col] = crop
+            else:
+                x = col * min_w
+                y = row * min_h
+                contact_sheet[y:y + min_h, x:x + min_w, :] = crop
+            imgs[idx] = None
 
         if not os.path.exists(output_dir):
             try: os.makedirs(output_dir)